@@ -132,9 +132,9 @@ class HDRUKLibraryClient:
             # the rest of the output
 
             # add version datetime - parse from concept_history_date
-            codes["version_datetime"] = [
-                pd.to_datetime(codedict["concept_history_date"]) for codedict in codelist_api_return
-            ]
+            codes["version_datetime"] = pd.to_datetime(
+                [codedict["concept_history_date"] for codedict in codelist_api_return], format="ISO8601"
+            )
 
             codes["phenotype_source"] = ["HDRUK"] * len(codes["code"])
 
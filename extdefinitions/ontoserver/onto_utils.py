@@ -337,11 +337,12 @@ def transform_refsets_to_definitions(refsets_df, megalith_config):
         # Create list of code objects
         codes = [
             Code(
-                code=row["concept_code"],
-                code_description=row["concept_name"],
+                code=concept_code,
+                code_description=concept_name,
                 code_vocabulary=VocabularyType.SNOMED,
             )
-            for _, row in refset_group.iterrows()
+            for concept_code, concept_name in zip(refset_group["concept_code"], refset_group["concept_name"],
+                                                  strict=True)
         ]
 
         # Create Codelist object
@@ -100,13 +100,14 @@ def process_single_url(url):
 
     vocabulary_type = vocab_mappings.get(vocabulary, VocabularyType.SNOMED)
 
+    # first column is the code and second the description, whatever the csv calls them
     codes = [
         Code(
-            code=row.iloc[0],
-            code_description=row.iloc[1],
+            code=code,
+            code_description=code_description,
             code_vocabulary=vocabulary_type,
         )
-        for _, row in df_from_csv.iterrows()
+        for code, code_description in zip(df_from_csv.iloc[:, 0], df_from_csv.iloc[:, 1], strict=True)
     ]
 
     codelist = Codelist(
@@ -1,3 +1,5 @@
+import logging
+
 import streamlit as st
 
 from utils.database_utils import get_snowflake_session
@@ -10,19 +12,29 @@ from utils.config_utils import load_config, preload_vocabulary
 # Creates the single Snowflake connection used throughout the app.
 # Pre-Loads the most recent vocabulary (if available)
 
+logger = logging.getLogger(__name__)
+
 st.set_page_config(page_title="PhenoLab", layout="wide", initial_sidebar_state="expanded")
 set_font_lato()
 
-# initialise snowflake connection
-st.session_state.session = get_snowflake_session()
-try:
-    st.session_state.session.sql("SELECT 1").collect()
-    connection_status = "Connected to Snowflake"
-except Exception as e:
-    connection_status = f"Connection failed: {e}"
+# initialise snowflake connection once and reuse it across reruns, rather than opening a new one each time the
+# script reruns
+if "session" not in st.session_state:
+    st.session_state.session = get_snowflake_session()
+# check the connection until it succeeds once in this session, rather than on every rerun of this page. A failure
+# isn't stored, so the next rerun checks again
+if "connection_status" in st.session_state:
+    connection_status = st.session_state.connection_status
+else:
+    try:
+        st.session_state.session.sql("SELECT 1").collect()
+        connection_status = st.session_state.connection_status = "Connected to Snowflake"
+    except Exception as e:
+        connection_status = f"Connection failed: {e}"
 
 # Load configuration file
-st.session_state.config = load_config()
+if "config" not in st.session_state:
+    st.session_state.config = load_config()
 
 # vocabulary session state - now loads from Snowflake after config is available
 if "codes" not in st.session_state:
@@ -31,7 +43,7 @@ if "codes" not in st.session_state:
 else:
     vocab_loaded = st.session_state.codes is not None
     vocab_message = "Vocabulary loaded in session"
-print(st.session_state.config)
+logger.debug("Loaded config: %s", st.session_state.config)
 
 ## PAGE DISPLAY
 st.title("PhenoLab: Clinical Definition and Phenotype Creator")
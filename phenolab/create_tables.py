@@ -3,21 +3,11 @@ from snowflake.connector.errors import ProgrammingError
 from snowflake.snowpark import Session
 
 
-def create_definition_table(session: Session, table_name: str,
-        database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY"):
+def _create_definition_table_sql(table_name: str, database: str, schema: str) -> str:
     """
-    Creates a definition table if it doesn't exist.
-    Args:
-        session:
-            Snowflake session object
-        table_name(str):
-            Name of the table to create
-        database (str):
-            Name of the database
-        schema (str):
-            Name of the schema
+    Returns the CREATE TABLE IF NOT EXISTS statement for a definition table.
     """
-    create_table_sql = f"""
+    return f"""
     CREATE TABLE IF NOT EXISTS {database}.{schema}.{table_name}(
         CODE VARCHAR,
         CODE_DESCRIPTION VARCHAR,
@@ -33,10 +23,55 @@ def create_definition_table(session: Session, table_name: str,
         UPLOADED_DATETIME TIMESTAMP_NTZ
     )
     """
-    session.sql(create_table_sql).collect()
+
+
+def create_definition_table(session: Session, table_name: str,
+        database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY"):
+    """
+    Creates a definition table if it doesn't exist.
+    Args:
+        session:
+            Snowflake session object
+        table_name(str):
+            Name of the table to create
+        database (str):
+            Name of the database
+        schema (str):
+            Name of the schema
+    """
+    session.sql(_create_definition_table_sql(table_name, database, schema)).collect()
     print("Target table ensured")
 
 
+def create_definition_tables(session: Session, table_names: list[str],
+        database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY"):
+    """
+    Creates several definition tables if they don't exist. Several tables are submitted as a single Snowflake
+    Scripting block, so there is one round-trip regardless of the number of tables.
+    Args:
+        session:
+            Snowflake session object
+        table_names(list[str]):
+            Names of the tables to create
+        database (str):
+            Name of the database
+        schema (str):
+            Name of the schema
+    """
+    if len(table_names) == 1:
+        create_definition_table(session, table_names[0], database, schema)
+        return
+
+    create_table_sql = [_create_definition_table_sql(table_name, database, schema) for table_name in table_names]
+    session.sql(f"""
+    EXECUTE IMMEDIATE $$
+    BEGIN
+        {";".join(create_table_sql)};
+    END;
+    $$""").collect()
+    print(f"{len(table_names)} target tables ensured")
+
+
 def create_temp_definition_table(session: Session, df: pd.DataFrame, table_name: str,
         database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY"):
     """
@@ -109,7 +144,8 @@ def merge_definition_tables(
 
 
 def load_definitions_to_snowflake(session: Session, df: pd.DataFrame, table_name: str,
-        database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY"):
+        database: str = "INTELLIGENCE_DEV", schema: str = "AI_CENTRE_DEFINITION_LIBRARY",
+        create_table: bool = True):
     """
     Loads definition data to Snowflake by overwriting the table.
     Args:
@@ -119,10 +155,13 @@ def load_definitions_to_snowflake(session: Session, df: pd.DataFrame, table_name
             DataFrame containing definition data
         table_name (str):
             Name of target table
+        create_table (bool):
+            Whether to create the table if it doesn't exist. Set to False if the caller has already created it.
     """
 
     # Create table if not exists
-    create_definition_table(session, table_name, database, schema)
+    if create_table:
+        create_definition_table(session, table_name, database, schema)
 
     df.columns = df.columns.str.upper()
     session.write_pandas(df, 
@@ -4,6 +4,8 @@ import yaml
 from utils.database_utils import (
     get_snowflake_session,
     get_definitions_from_snowflake_and_return_as_annotated_list_with_id_list,
+    get_definitions_in_tables,
+    get_table_names_in_schema,
     return_codes_for_given_definition_id_as_df,
 )
 from utils.definition_interaction_utils import (
@@ -27,9 +29,8 @@ def view_definitions():
     Users can select which tables they would like to view definitions from
     """
 
-    all_tables = [row["name"] for row in st.session_state.session.sql(
-        f"""SHOW TABLES IN SCHEMA {st.session_state.config["definition_library"]["database"]}.
-            {st.session_state.config["definition_library"]["schema"]}""").collect()]
+    all_tables = get_table_names_in_schema(st.session_state.config["definition_library"]["database"],
+                                           st.session_state.config["definition_library"]["schema"])
 
     with open("external_definitions.yml", "r") as f:
         external_definition_sources = yaml.safe_load(f)
@@ -40,15 +41,8 @@ def view_definitions():
     chosen_tables = st.multiselect("Select definition source", options=available_tables, default='AIC_DEFINITIONS',
                     placeholder="Select a definition source", label_visibility="collapsed",)
     if chosen_tables:
-        table_list_str = ', '.join([f"'{t}'" for t in chosen_tables])
-        query = f"""SELECT DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, DEFINITION_SOURCE,
-        VERSION_DATETIME, UPLOADED_DATETIME
-        FROM {st.session_state.config["definition_library"]["database"]}.
-            {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE
-        WHERE SOURCE_TABLE IN ({table_list_str})
-        GROUP BY DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, VERSION_DATETIME, UPLOADED_DATETIME, DEFINITION_SOURCE
-        ORDER BY DEFINITION_NAME"""
-        df = st.session_state.session.sql(query).to_pandas()
+        # cached on the chosen tables, so reruns from other widgets (or reselecting the same sources) don't re-query
+        df = get_definitions_in_tables(chosen_tables)
 
         st.text(" ")
         st.text("View included codes using checkbox (first column)")
@@ -1,3 +1,4 @@
+import logging
 import os
 import re
 
@@ -22,6 +23,8 @@ from utils.style_utils import set_font_lato
 # code definitions. Users can search across multiple vocabularies, add /
 # codes to definitions, and upload definitions to Snowflake. /
 
+logger = logging.getLogger(__name__)
+
 # TO DO
 # - Can we implement deferred tab rendering?
 # - E.g. if tab, with tab...
@@ -104,7 +107,7 @@ def display_definition_panel() -> str:
                 final_definition_name = f"measurement_{new_definition_name}"
 
             st.session_state.current_definition = Definition.from_scratch(definition_name=final_definition_name)
-            print(st.session_state.current_definition)
+            logger.debug("Created definition %s", st.session_state.current_definition)
             if "used_checkbox_keys" in st.session_state:
                 for checkbox_key in st.session_state.used_checkbox_keys:
                     st.session_state[checkbox_key] = False
@@ -152,12 +155,12 @@ def display_edit_definition_panel() -> str:
 def main():
     st.set_page_config(page_title="Manage Definitions", layout="wide")
     set_font_lato()
+    if "session" not in st.session_state:
+        st.session_state.session = get_snowflake_session()
     if "config" not in st.session_state:
         st.session_state.config = load_config()
     if "codes" not in st.session_state:
         preload_vocabulary()
-    if "session" not in st.session_state:
-        st.session_state.session = get_snowflake_session()
     st.title("Manage Definitions")
     # load_dotenv()
 
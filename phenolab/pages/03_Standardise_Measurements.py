@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 from utils.config_utils import load_config
 from utils.database_utils import get_snowflake_session
@@ -12,6 +11,8 @@ from utils.measurement_interaction_utils import (
     create_measurements_feature_table,
     display_measurement_config_from_file,
     get_available_measurement_configs,
+    get_measurement_config_names,
+    get_measurement_config_summary,
     get_measurement_values,
     load_measurement_config,
     load_measurement_configs_into_tables,
@@ -47,8 +48,8 @@ def display_measurement_analysis(config, tab1 = True, upper_limit = None, lower_
         with st.form(form_name):
             st.write('WARNING: increasing the number of rows to pull can be very expensive and slow down the running of this section')
             col1, col2, col3, col4, col5 = st.columns(5)
-            local_max_centile = df_all.value.quantile(0.9999)
-            local_min_centile = df_all.value.quantile(0.0001)
+            # both centiles from one quantile call, which sorts the values once rather than twice
+            local_min_centile, local_max_centile = df_all.value.quantile([0.0001, 0.9999])
 
             with col1:
                 xmin = st.number_input(f'XMin ({config.primary_standard_unit})',
@@ -71,6 +72,10 @@ def display_measurement_analysis(config, tab1 = True, upper_limit = None, lower_
                 plot_submit = st.form_submit_button()
 
             if plot_submit:
+                # plotly is slow to import and only needed once a plot is requested, so don't pay for it on
+                # every rerun of the page
+                import plotly.express as px
+
                 if row_limit > 100000:
                     df_values = get_measurement_values(config.definition_name, row_limit)
                     df_mapped = apply_unit_mapping(df_values, config)
@@ -78,11 +83,10 @@ def display_measurement_analysis(config, tab1 = True, upper_limit = None, lower_
 
                 # apply 99.5 percentile cutoff - otherwise extreme outliers will hide true distribution
                 #Limit this by the values as this is slowing things down
-                above_min = np.where(df_all.converted_value >= xmin)
-                below_max = np.where(df_all.converted_value <= xmax)
+                in_range = df_all.converted_value.between(xmin, xmax)
 
                 unit_distr_plot = px.histogram(
-                    df_all.loc[np.intersect1d(above_min, below_max), :],
+                    df_all.loc[in_range, :],
                         x='converted_value',
                         color = 'mapped_unit',
                         range_x=[xmin, xmax],
@@ -103,13 +107,13 @@ def display_measurement_analysis(config, tab1 = True, upper_limit = None, lower_
             plot_submit = st.form_submit_button('Plot distributions')
 
             if plot_submit:
-                xmax = df_all.converted_value.quantile(0.995)
-                xmin = df_all.converted_value.quantile(0.005)
+                import plotly.express as px
+
+                xmin, xmax = df_all.converted_value.quantile([0.005, 0.995])
 
-                above_min = np.where(df_all.converted_value >= xmin)
-                below_max = np.where(df_all.converted_value <= xmax)
+                in_range = df_all.converted_value.between(xmin, xmax)
                 unit_distr_plot = px.histogram(
-                            df_all.loc[np.intersect1d(above_min, below_max), :],
+                            df_all.loc[in_range, :],
                             x='converted_value',
                             color = 'mapped_unit',
                             range_x=[xmin, xmax],
@@ -198,6 +202,10 @@ def display_unit_mapping_panel(config):
         st.warning(f"No units found for {config.definition_name} in the configuration file.")
         return
 
+    # numeric share per unit for the whole column at once, rather than dividing inside the row loop
+    unit_stats_df['NUMERIC_PERCENT'] = np.where(unit_stats_df['TOTAL_COUNT'] == 0, np.nan,
+                                                100 * unit_stats_df['NUMERIC_COUNT'] / unit_stats_df['TOTAL_COUNT'])
+
     # creat dict for quick lookup
     current_mappings = {m.source_unit: m.standard_unit for m in config.unit_mappings}
 
@@ -233,8 +241,7 @@ def display_unit_mapping_panel(config):
                 cols[2].write("No numeric data")
 
             # numeric %
-            num_percent = row['NUMERIC_COUNT']/row['TOTAL_COUNT']
-            cols[3].write(f"{num_percent:.1f}%")
+            cols[3].write(f"{row['NUMERIC_PERCENT']:.1f}%")
 
             # target unit selection
             options = [""] + config.standard_units
@@ -385,14 +392,9 @@ def display_conversion_group(config, units, existing_conversions, group_type):
             st.rerun()
 
 def display_configs_in_tables():
-    measurement_configs = st.session_state.session.sql(f"""
-        SELECT DISTINCT
-            DEFINITION_NAME,
-            CONFIG_ID
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.MEASUREMENT_CONFIGS
-        ORDER BY DEFINITION_NAME
-        """).to_pandas()
+    # both reads are cached (the second on the selected config), so reruns from other widgets, or switching back to a
+    # config already viewed, are served from memory. Loading configs into the tables clears these caches.
+    measurement_configs = get_measurement_config_names()
 
     definition_name = st.selectbox(
         "Select a measurement configuration",
@@ -402,64 +404,17 @@ def display_configs_in_tables():
 
     config = measurement_configs.loc[measurement_configs['DEFINITION_NAME'] == definition_name, 'CONFIG_ID'].values[0]
 
-    # Get unit mappings
-    unit_mappings = st.session_state.session.sql(f"""
-        SELECT DISTINCT
-            COALESCE(SOURCE_UNIT, 'No Unit') AS SOURCE_UNIT,
-            STANDARD_UNIT
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.UNIT_MAPPINGS
-        WHERE CONFIG_ID = '{config}'
-        ORDER BY SOURCE_UNIT
-        """).to_pandas()
-
-    # Get primary unit
-    primary_unit_df = st.session_state.session.sql(f"""
-        SELECT DISTINCT
-            UNIT
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.STANDARD_UNITS
-            WHERE CONFIG_ID = '{config}'
-            AND PRIMARY_UNIT = TRUE
-        """).to_pandas()
-
-    primary_unit = primary_unit_df['UNIT'].iloc[0] if not primary_unit_df.empty else 'Not set'
-
-    # Get value bounds
-    value_bounds = st.session_state.session.sql(f"""
-        SELECT
-            LOWER_LIMIT,
-            UPPER_LIMIT
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.VALUE_BOUNDS
-            WHERE CONFIG_ID = '{config}'
-        """).to_pandas()
-
-    if not value_bounds.empty:
-        upper_limit = value_bounds.UPPER_LIMIT.iloc[0]
-        lower_limit = value_bounds.LOWER_LIMIT.iloc[0]
-    else:
-        upper_limit = np.nan
-        lower_limit = np.nan
-
-    # Get measurement statistics
-    total_measurements = st.session_state.session.sql(f"""
-        SELECT
-            SUM(SOURCE_UNIT_COUNT)
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.UNIT_MAPPINGS
-            WHERE CONFIG_ID = '{config}'
-        """).to_pandas()['SUM(SOURCE_UNIT_COUNT)'].iloc[0]
-
-    mapped_measurements = st.session_state.session.sql(f"""
-        SELECT
-            SUM(SOURCE_UNIT_COUNT) AS MAPPED_COUNT
-        FROM {st.session_state.config["measurement_configs"]["database"]}.
-        {st.session_state.config["measurement_configs"]["schema"]}.UNIT_MAPPINGS
-            WHERE CONFIG_ID = '{config}'
-            AND STANDARD_UNIT IS NOT NULL
-            AND STANDARD_UNIT != ''
-        """).to_pandas()['MAPPED_COUNT'].iloc[0]
+    config_rows = get_measurement_config_summary(config)
+
+    config_summary = config_rows.iloc[0]
+    unit_mappings = config_rows[config_rows['SOURCE_UNIT'].notna()]
+    is_mapped = unit_mappings['STANDARD_UNIT'].notna() & (unit_mappings['STANDARD_UNIT'] != '')
+
+    primary_unit = config_summary['PRIMARY_UNIT'] if pd.notna(config_summary['PRIMARY_UNIT']) else 'Not set'
+    upper_limit = config_summary['UPPER_LIMIT'] if pd.notna(config_summary['UPPER_LIMIT']) else np.nan
+    lower_limit = config_summary['LOWER_LIMIT'] if pd.notna(config_summary['LOWER_LIMIT']) else np.nan
+    total_measurements = unit_mappings['SOURCE_UNIT_COUNT'].sum()
+    mapped_measurements = unit_mappings.loc[is_mapped, 'SOURCE_UNIT_COUNT'].sum()
 
     if not mapped_measurements or pd.isna(mapped_measurements):
         mapped_measurements = 0
@@ -489,7 +444,7 @@ def display_configs_in_tables():
 
     # unit mappings table
     if not unit_mappings.empty:
-        mapped_units = unit_mappings[unit_mappings['STANDARD_UNIT'].notna() & (unit_mappings['STANDARD_UNIT'] != '')]
+        mapped_units = unit_mappings[is_mapped]
         if not mapped_units.empty:
             st.dataframe(
                 mapped_units[['SOURCE_UNIT', 'STANDARD_UNIT']].rename(columns={
@@ -640,14 +595,14 @@ def main():  # noqa: C901
                 st.warning("No measurement configurations found. Please check data/measurements/<icb_name>.")
                 return
 
-            # 2. map definition name to filename
+            # 2. map definition name to loaded config (kept so the selected one isn't parsed a second time)
             config_by_name = {}
 
             for config_file in measurement_configs:
                 try:
                     config = load_measurement_config(config_file)
                     if config:
-                        config_by_name[config.definition_name] = config_file
+                        config_by_name[config.definition_name] = config
                 except Exception as e:
                     st.error(f"Error loading {config_file}: {e}")
                     pass
@@ -664,8 +619,7 @@ def main():  # noqa: C901
             )
 
             if selected_def_name:
-                config_filename = config_by_name[selected_def_name]
-                config = load_measurement_config(config_filename)
+                config = config_by_name[selected_def_name]
 
                 if config:
                     st.session_state.selected_definition = selected_def_name
@@ -9,7 +9,7 @@ import sys
 
 import pandas as pd
 import yaml
-from create_tables import create_definition_table, load_definitions_to_snowflake
+from create_tables import create_definition_tables, load_definitions_to_snowflake
 from snowflake.snowpark import Session
 from utils.config_utils import load_config
 from utils.definition_interaction_utils import update_aic_definitions_table
@@ -71,36 +71,30 @@ def setup_definition_tables(environment: str, connection_name: str):
     session = Session.builder.config("connection_name", connection_name).create()
     config = load_config(session=session, deploy_env=environment)
 
-    # 1. AIC
-    create_definition_table(
-            session=session,
-            database=config["definition_library"]["database"],
-            schema=config["definition_library"]["schema"],
-            table_name="AIC_DEFINITIONS"
-        )
-    update_aic_definitions_table(session=session, config=config)
-
-    # 2. External definitions (HDRUK, OpenCodelists, Ontoserver SNOMED)
     with open("external_definitions.yml", "r") as f:
         external_definition_sources = yaml.safe_load(f)
 
+    # 1. Create all definition tables if they don't exist (preserves ICB_DEFINITIONS user data), in one go
+    create_definition_tables(
+        session=session,
+        database=config["definition_library"]["database"],
+        schema=config["definition_library"]["schema"],
+        table_names=["AIC_DEFINITIONS", "ICB_DEFINITIONS"] + list(external_definition_sources.keys())
+    )
+
+    # 2. AIC
+    update_aic_definitions_table(session=session, config=config)
+
+    # 3. External definitions (HDRUK, OpenCodelists, Ontoserver SNOMED)
     for table_name, ext_config in external_definition_sources.items():
         file_name = ext_config["file"]
         df = pd.read_parquet(file_name)
         print(f"Loaded {file_name} definitions from file - {len(df)} rows")
         load_definitions_to_snowflake(session=session, df=df, table_name=table_name,
-            database=config["definition_library"]["database"], schema=config["definition_library"]["schema"])
+            database=config["definition_library"]["database"], schema=config["definition_library"]["schema"],
+            create_table=False)
         print(f"Loaded definitions into Snowflake table {table_name}")
 
-    # 3. Create ICB_DEFINITIONS table if it doesn't exist (preserve user data)
-    print("Creating ICB_DEFINITIONS table if it doesn't exist...")
-    create_definition_table(
-        session=session,
-        database=config["definition_library"]["database"],
-        schema=config["definition_library"]["schema"],
-        table_name="ICB_DEFINITIONS"
-    )
-
     # 4. Create DEFINITIONSTORE view - this doesn't strictly need to be run every time as it's a VIEW and not a table,
     # but I have left it in for clarity and to ensure it is always up to date with the latest external tables.
     print("Creating DEFINITIONSTORE view...")
@@ -1,11 +1,10 @@
 import os
 
 import yaml
-from dotenv import load_dotenv
-import glob
 import pandas as pd
 import streamlit as st
 from snowflake.snowpark import Session
+from utils.database_utils import fetch_dataframe
 
 def load_phenolab_config_mapping():
     """
@@ -28,12 +27,14 @@ def load_config(session: Session = None, deploy_env: str = None) -> dict:
         for remote
     """
 
-    load_dotenv(override=True)
     if os.environ['HOME'] == "/home/udf":
         # This is a hideous hack, but this env variable exists on streamlit in snowflake
         local_development = False
     else:
         local_development = True
+        # .env files only exist locally, so only import and read dotenv there
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
 
     deploy_env = deploy_env or os.getenv("DEPLOY_ENV")
     if deploy_env is None:
@@ -88,7 +89,14 @@ def preload_vocabulary():
     """
 
     try:
-        vocab_df = session.sql(query).to_pandas()
+        vocab_df = fetch_dataframe(query, session=session)
+        # only a handful of vocabularies repeated across every code, so store as a category: much smaller, and
+        # quicker to filter on and to hash for the cached code search
+        vocab_df["VOCABULARY"] = vocab_df["VOCABULARY"].astype("category")
+        # the counts don't need 64 bits; downcast picks the smallest integer type that holds every value. The value
+        # summaries stay float64, as float32 would lose precision on the displayed values
+        for col in ["CODE_COUNT", "UNIQUE_PATIENT_COUNT"]:
+            vocab_df[col] = pd.to_numeric(vocab_df[col], downcast="integer")
         st.session_state.codes = vocab_df
         return True, f"Vocabulary loaded ({len(vocab_df):,} codes)"
     except Exception as e:
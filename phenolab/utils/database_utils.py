@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 
 import pandas as pd
@@ -17,7 +18,27 @@ Uses a single snowflake connectino, and context managers for temporary db/schema
 Uses parameters in config.py to adapt to different source database naming.
 """
 
+logger = logging.getLogger(__name__)
+
+# Earliest clinical event date included in condition and measurement queries
+EVENT_HISTORY_START_DATE = "2000-01-01"
+
+
+def event_date_window_sql(date_column: str) -> str:
+    """
+    SQL predicate restricting a date column to events from EVENT_HISTORY_START_DATE to the end of the current year.
+    Written as a plain range on the column (rather than YEAR(col) BETWEEN ...) so Snowflake can prune
+    micro-partitions on the date.
+    """
+    return (f"{date_column} >= '{EVENT_HISTORY_START_DATE}' "
+            f"AND {date_column} < DATEADD(year, 1, DATE_TRUNC('year', CURRENT_DATE()))")
+
+
 def get_snowflake_session() -> Session:
+    """
+    Get a Snowflake session. Callers keep the result in st.session_state.session, so each browser session has its
+    own Snowpark session (and its own session-scoped temporary objects) that is reused across reruns.
+    """
     try:
         return get_active_session() # this function works for Snowflake on Streamlit
     except SnowparkSessionException:
@@ -44,14 +65,48 @@ def standard_query_cache(func):
     return st.cache_data(ttl=1800, show_spinner="Reading from database...")(func)
 
 
+def query_tag_params(operation: str) -> dict:
+    """
+    Statement parameters that tag a query with the PhenoLab operation it belongs to, so feature builds can be
+    found in Snowflake's query history. Set per statement rather than with ALTER SESSION SET QUERY_TAG, which
+    would cost a round-trip to set and another to reset.
+    """
+    return {"QUERY_TAG": f"phenolab.{operation}"}
+
+
+def fetch_dataframe(query: str, params: Optional[list] = None, session: Optional[Session] = None) -> pd.DataFrame:
+    """
+    Run a query and return its result as a DataFrame.
+
+    Args:
+        query:
+            SQL query to run
+        params:
+            Values for any ? placeholders in the query
+        session:
+            Snowflake session to use. If not provided, will use the session state from Streamlit.
+    """
+    session = session or st.session_state.session
+    return session.sql(query, params=params).to_pandas()
+
+
 @standard_query_cache
-def get_data_from_snowflake_to_dataframe(query: str) -> pd.DataFrame:
-    return st.session_state.session.sql(query).to_pandas()
+def get_data_from_snowflake_to_dataframe(query: str, params: Optional[list] = None) -> pd.DataFrame:
+    return fetch_dataframe(query, params=params)
 
 
 @standard_query_cache
-def get_data_from_snowflake_to_list(query: str) -> list:
-    return st.session_state.session.sql(query).collect()
+def get_data_from_snowflake_to_list(query: str, params: Optional[list] = None) -> list:
+    return st.session_state.session.sql(query, params=params).collect()
+
+
+@standard_query_cache
+def get_table_names_in_schema(database: str, schema: str) -> list[str]:
+    """
+    Get the names of all tables in a schema. Cached, as metadata queries are slow and the set of tables rarely
+    changes within a session.
+    """
+    return [row["name"] for row in st.session_state.session.sql(f"SHOW TABLES IN SCHEMA {database}.{schema}").collect()]
 
 
 @standard_query_cache
@@ -65,10 +120,45 @@ def get_definitions_from_snowflake_and_return_as_annotated_list_with_id_list() -
     """
     comparison_definitions = get_data_from_snowflake_to_dataframe(comparison_query)
 
-    return comparison_definitions["DEFINITION_ID"].to_list(), [
-        f"{row['DEFINITION_NAME']} [{row['DEFINITION_SOURCE']}]"
-        for _, row in comparison_definitions.iterrows()
-    ]
+    # build ids and labels in a single pass over the columns, rather than a second row-wise iterrows pass
+    definition_ids, definition_labels = [], []
+    for definition_id, definition_name, definition_source in zip(
+        comparison_definitions["DEFINITION_ID"],
+        comparison_definitions["DEFINITION_NAME"],
+        comparison_definitions["DEFINITION_SOURCE"],
+        strict=True,
+    ):
+        definition_ids.append(definition_id)
+        definition_labels.append(f"{definition_name} [{definition_source}]")
+
+    return definition_ids, definition_labels
+
+
+@standard_query_cache
+def get_definitions_in_tables(table_names: list[str]) -> pd.DataFrame:
+    """
+    Get one row of metadata per definition version in the given definition library tables. Reads the tables
+    directly rather than DEFINITIONSTORE, as the view's per-code concept map joins aren't needed for
+    definition-level metadata and would otherwise run before the GROUP BY.
+
+    Args:
+        table_names:
+            Names of the definition tables in the definition library schema
+    """
+    definition_union = " UNION ALL ".join(
+        f"""SELECT DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, DEFINITION_SOURCE,
+        VERSION_DATETIME, UPLOADED_DATETIME
+        FROM {st.session_state.config["definition_library"]["database"]}.
+            {st.session_state.config["definition_library"]["schema"]}.{table}
+        WHERE CODE IS NOT NULL"""
+        for table in table_names
+    )
+    query = f"""SELECT DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, DEFINITION_SOURCE,
+    VERSION_DATETIME, UPLOADED_DATETIME
+    FROM ({definition_union})
+    GROUP BY DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, VERSION_DATETIME, UPLOADED_DATETIME, DEFINITION_SOURCE
+    ORDER BY DEFINITION_NAME"""
+    return fetch_dataframe(query)
 
 
 @standard_query_cache
@@ -84,10 +174,10 @@ def return_codes_for_given_definition_id_as_df(chosen_definition_id: str) -> pd.
             CODELIST_VERSION
         FROM {st.session_state.config["definition_library"]["database"]}.
             {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE
-        WHERE DEFINITION_ID = '{chosen_definition_id}'
+        WHERE DEFINITION_ID = ?
         ORDER BY VOCABULARY, CODE
         """
-    return get_data_from_snowflake_to_dataframe(codes_query)
+    return get_data_from_snowflake_to_dataframe(codes_query, params=[chosen_definition_id])
 
 
 # @standard_query_cache
@@ -107,13 +197,21 @@ def return_codes_for_given_definition_id_as_df(chosen_definition_id: str) -> pd.
 
 
 @standard_query_cache
-def get_measurement_unit_statistics(definition_name: str) -> pd.DataFrame:
+def get_measurement_unit_statistics_for_definitions(definition_names: list[str]) -> pd.DataFrame:
     """
-    Get statistics for all units associated with a measurement definition
+    Get statistics for all units associated with each of several measurement definitions, aggregated in Snowflake
+    in one grouped query (one row per definition and unit) rather than a query per definition
+
+    Args:
+        definition_names:
+            Names of the measurement definitions
     """
+    if not definition_names:
+        return pd.DataFrame()
     query = f"""
     WITH measurement_values AS (
         SELECT
+            def.DEFINITION_NAME,
             obs.RESULT_VALUE_UNIT,
             TRY_CAST(obs.RESULT_VALUE AS FLOAT) AS VALUE
         FROM {st.session_state.config["gp_observation_table"]} obs
@@ -121,10 +219,11 @@ def get_measurement_unit_statistics(definition_name: str) -> pd.DataFrame:
             {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
             ON obs.OBSERVATION_CONCEPT_CODE = def.CODE
             AND obs.OBSERVATION_CONCEPT_VOCABULARY = def.VOCABULARY
-        WHERE def.DEFINITION_NAME = '{definition_name}'
+        WHERE def.DEFINITION_NAME IN ({", ".join("?" * len(definition_names))})
             AND obs.RESULT_VALUE IS NOT NULL
     )
     SELECT
+        DEFINITION_NAME,
         COALESCE(RESULT_VALUE_UNIT, 'No Unit') AS UNIT,
         COUNT(*) AS TOTAL_COUNT,
         COUNT(VALUE) AS NUMERIC_COUNT,
@@ -134,11 +233,11 @@ def get_measurement_unit_statistics(definition_name: str) -> pd.DataFrame:
         MIN(VALUE) AS MIN_VALUE,
         MAX(VALUE) AS MAX_VALUE
     FROM measurement_values
-    GROUP BY RESULT_VALUE_UNIT
-    ORDER BY TOTAL_COUNT DESC
+    GROUP BY DEFINITION_NAME, RESULT_VALUE_UNIT
+    ORDER BY DEFINITION_NAME, TOTAL_COUNT DESC
     """
-    print(query)
-    return get_data_from_snowflake_to_dataframe(query)
+    logger.debug("Unit statistics query:\n%s", query)
+    return get_data_from_snowflake_to_dataframe(query, params=list(definition_names))
 
 
 def get_available_measurements() -> pd.DataFrame:
@@ -200,10 +299,10 @@ def get_condition_patient_counts_by_year(definition_name: str) -> pd.DataFrame:
             {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON obs.OBSERVATION_CONCEPT_CODE = def.CODE
         AND obs.OBSERVATION_CONCEPT_VOCABULARY = def.VOCABULARY
-    WHERE def.DEFINITION_NAME = '{definition_name}'
+    WHERE def.DEFINITION_NAME = ?
         AND def.VOCABULARY = 'SNOMED'
         AND obs.CLINICAL_EFFECTIVE_DATE IS NOT NULL
-        AND YEAR(obs.CLINICAL_EFFECTIVE_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+        AND {event_date_window_sql('obs.CLINICAL_EFFECTIVE_DATE')}
     """)
 
     # ICD10 from STG_SUS__APC_DIAGNOSIS_ICD10
@@ -216,9 +315,9 @@ def get_condition_patient_counts_by_year(definition_name: str) -> pd.DataFrame:
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON icd.CONCEPT_CODE = def.CODE
         AND def.VOCABULARY = 'ICD10'
-    WHERE def.DEFINITION_NAME = '{definition_name}'
+    WHERE def.DEFINITION_NAME = ?
         AND icd.ACTIVITY_DATE IS NOT NULL
-        AND YEAR(icd.ACTIVITY_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+        AND {event_date_window_sql('icd.ACTIVITY_DATE')}
     """)
 
     # OPCS4 from STG_SUS__APC_PROCEDURE_OPCS4
@@ -231,9 +330,9 @@ def get_condition_patient_counts_by_year(definition_name: str) -> pd.DataFrame:
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON opcs.CONCEPT_CODE = def.CODE
         AND def.VOCABULARY = 'OPCS4'
-    WHERE def.DEFINITION_NAME = '{definition_name}'
+    WHERE def.DEFINITION_NAME = ?
         AND opcs.ACTIVITY_DATE IS NOT NULL
-        AND YEAR(opcs.ACTIVITY_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+        AND {event_date_window_sql('opcs.ACTIVITY_DATE')}
     """)
 
     # count patients per year
@@ -249,7 +348,7 @@ def get_condition_patient_counts_by_year(definition_name: str) -> pd.DataFrame:
     ORDER BY YEAR
     """
 
-    return get_data_from_snowflake_to_dataframe(combined_query)
+    return get_data_from_snowflake_to_dataframe(combined_query, params=[definition_name] * len(query_parts))
 
 
 @standard_query_cache
@@ -277,9 +376,9 @@ def get_unique_patients_for_condition(definition_name: str) -> int:
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON obs.OBSERVATION_CONCEPT_CODE = def.CODE
         AND obs.OBSERVATION_CONCEPT_VOCABULARY = def.VOCABULARY
-    WHERE def.DEFINITION_NAME = '{definition_name}'
+    WHERE def.DEFINITION_NAME = ?
         AND def.VOCABULARY = 'SNOMED'
-        AND YEAR(obs.CLINICAL_EFFECTIVE_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+        AND {event_date_window_sql('obs.CLINICAL_EFFECTIVE_DATE')}
     """)
 
     # ICD10 from STG_SUS__APC_DIAGNOSIS_ICD10
@@ -290,8 +389,8 @@ def get_unique_patients_for_condition(definition_name: str) -> int:
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON icd.CONCEPT_CODE = def.CODE
         AND def.VOCABULARY = 'ICD10'
-    WHERE def.DEFINITION_NAME = '{definition_name}'
-        AND YEAR(icd.ACTIVITY_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+    WHERE def.DEFINITION_NAME = ?
+        AND {event_date_window_sql('icd.ACTIVITY_DATE')}
     """)
 
     # OPCS4 from STG_SUS__APC_PROCEDURE_OPCS4
@@ -302,8 +401,8 @@ def get_unique_patients_for_condition(definition_name: str) -> int:
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON opcs.CONCEPT_CODE = def.CODE
         AND def.VOCABULARY = 'OPCS4'
-    WHERE def.DEFINITION_NAME = '{definition_name}'
-        AND YEAR(opcs.ACTIVITY_DATE) BETWEEN 2000 AND YEAR(CURRENT_DATE())
+    WHERE def.DEFINITION_NAME = ?
+        AND {event_date_window_sql('opcs.ACTIVITY_DATE')}
     """)
 
     # count unique patients
@@ -315,5 +414,5 @@ def get_unique_patients_for_condition(definition_name: str) -> int:
     FROM all_patients
     """
 
-    result = get_data_from_snowflake_to_dataframe(combined_query)
+    result = get_data_from_snowflake_to_dataframe(combined_query, params=[definition_name] * len(query_parts))
     return result.iloc[0]['UNIQUE_PATIENTS'] if not result.empty else 0
\ No newline at end of file
@@ -1,5 +1,6 @@
 import hashlib
 import json
+import logging
 import os
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -13,6 +14,8 @@ import pandas as pd
 # from boto3.dynamodb.conditions import Key
 # from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 
 class VocabularyType(Enum):
     """
@@ -247,22 +250,29 @@ class Definition:
                 else None
             )
 
+            # one row of codelist-level metadata per codelist, picked in a single pass rather than per group
+            codelist_metadata = input_df.drop_duplicates("codelist_id").set_index("codelist_id")
+
             codelists = []
             for codelist_id, codelist_df in input_df.groupby("codelist_id"):
+                metadata = codelist_metadata.loc[codelist_id]
+                # zip over the columns rather than iterrows, which builds a Series for every code
                 codes = [
                     Code(
-                        code=row["code"],
-                        code_description=row["code_description"],
-                        code_vocabulary=vocab_mappings[row["vocabulary"]],
+                        code=code,
+                        code_description=code_description,
+                        code_vocabulary=vocab_mappings[vocabulary],
+                    )
+                    for code, code_description, vocabulary in zip(
+                        codelist_df["code"], codelist_df["code_description"], codelist_df["vocabulary"], strict=True
                     )
-                    for _, row in codelist_df.iterrows()
                 ]
                 codelist = Codelist(
                     codes=codes,
                     codelist_id=codelist_id,
-                    codelist_name=codelist_df["codelist_name"].iloc[0],
-                    codelist_version=codelist_df["codelist_version"].iloc[0],
-                    codelist_vocabulary=vocab_mappings[codelist_df["vocabulary"].iloc[0]],
+                    codelist_name=metadata["codelist_name"],
+                    codelist_version=metadata["codelist_version"],
+                    codelist_vocabulary=vocab_mappings[metadata["vocabulary"]],
                 )
                 codelists.append(codelist)
 
@@ -327,7 +337,7 @@ class Definition:
             if codelist.codelist_vocabulary == vocabulary:
                 for existing_code in codelist.codes:
                     if existing_code.code == code.code and existing_code.code_vocabulary == code.code_vocabulary:
-                        print('Code already in codelist')
+                        logger.debug("Code already in codelist")
                         return False # code already exists, don't add dupe
                 codelist.add_code(code) # otherwise, add code to relevant codelist
 
@@ -364,11 +374,25 @@ class Definition:
         added_count = 0
         duplicate_count = 0
 
+        # index the codes already in the definition once, rather than rescanning every codelist for each new code
+        existing_codes = {(code.code, code.code_vocabulary) for code in self.codes}
+
         for code in codes:
-            if self.add_code(code):
-                added_count += 1
-            else:
+            key = (code.code, code.code_vocabulary)
+            if key in existing_codes:
                 duplicate_count += 1
+                continue
+
+            codelist = next(
+                (codelist for codelist in self.codelists if codelist.codelist_vocabulary == code.code_vocabulary),
+                None,
+            )
+            if codelist is None:
+                self.add_code(code)  # creates the codelist for this vocabulary
+            else:
+                codelist.codes.append(code)  # vocabulary already matches, so no need to re-validate the codelist
+            existing_codes.add(key)
+            added_count += 1
 
         return added_count, duplicate_count
 
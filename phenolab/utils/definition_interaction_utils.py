@@ -1,3 +1,4 @@
+import logging
 import os
 from contextlib import nullcontext
 from datetime import datetime
@@ -7,7 +8,11 @@ import pandas as pd
 import streamlit as st
 from snowflake.snowpark import Session
 from utils.database_utils import (
+    fetch_dataframe,
     get_definitions_from_snowflake_and_return_as_annotated_list_with_id_list,
+    get_definitions_in_tables,
+    get_table_names_in_schema,
+    query_tag_params,
     return_codes_for_given_definition_id_as_df,
 )
 from utils.definition import Code, Definition, VocabularyType
@@ -24,6 +29,8 @@ Provides functions to:
 - manage code selection when creating definitions
 """
 
+logger = logging.getLogger(__name__)
+
 # @st.cache_data(ttl=300)
 def load_definitions_list() -> List[str]:
     """
@@ -53,7 +60,7 @@ def load_definitions_list_from_icb_table() -> List[str]:
         GROUP BY DEFINITION_ID, DEFINITION_NAME, DEFINITION_VERSION, VERSION_DATETIME, UPLOADED_DATETIME, DEFINITION_SOURCE
         ORDER BY DEFINITION_NAME;
         """
-    df = st.session_state.session.sql(query).to_pandas()
+    df = fetch_dataframe(query)
     return df["DEFINITION_VERSION"].tolist()
 
 def load_definition(file_path_or_definition_name: str) -> Optional[Definition]:
@@ -83,8 +90,8 @@ def load_remote_definition(definition_version_name: str) -> Optional[Definition]
     """
     query = f"""SELECT * FROM {st.session_state.config["definition_library"]["database"]}.
     {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE
-    WHERE DEFINITION_VERSION = '{definition_version_name}';"""
-    df = st.session_state.session.sql(query).to_pandas()
+    WHERE DEFINITION_VERSION = ?;"""
+    df = fetch_dataframe(query, params=[definition_version_name])
     df.columns = df.columns.str.lower()
     return Definition.from_dataframe(df)
 
@@ -120,11 +127,9 @@ def get_icd10_children(parent_code: str, vocabulary_df: pd.DataFrame) -> pd.Data
     if len(parent_code) != 3:
         return pd.DataFrame()
 
-    child_pattern = f"^{parent_code}\\."
-    children = vocabulary_df[
-        (vocabulary_df["CODE"].str.match(child_pattern, na=False)) &
-        (vocabulary_df["VOCABULARY"] == "ICD10")
-    ]
+    # narrow to ICD10 on the (categorical) vocabulary first, then do a plain prefix check rather than a regex match
+    icd10_codes = vocabulary_df[vocabulary_df["VOCABULARY"] == "ICD10"]
+    children = icd10_codes[icd10_codes["CODE"].str.startswith(f"{parent_code}.", na=False)]
     return children
 
 def display_code_and_checkbox(row: pd.Series, checkbox_key: str, key_suffix=""):
@@ -156,9 +161,13 @@ def display_code_and_checkbox(row: pd.Series, checkbox_key: str, key_suffix=""):
                 if row["VOCABULARY"] == "ICD10" and len(row["CODE"]) == 3:
                     children = get_icd10_children(row["CODE"], st.session_state.codes)
                     if not children.empty:
-                        codes_to_add = []
-                        for _, child_row in children.iterrows():
-                            codes_to_add.append(create_code_from_row(child_row))
+                        # children are all ICD10, so no need to look up the vocabulary enum for each row
+                        codes_to_add = [
+                            Code(code=child_code, code_description=child_description,
+                                 code_vocabulary=VocabularyType.ICD10)
+                            for child_code, child_description in zip(children["CODE"], children["CODE_DESCRIPTION"],
+                                                                     strict=True)
+                        ]
 
                         added, duplicates = st.session_state.current_definition.add_codes_batch(codes_to_add)
                         if added > 0:
@@ -460,6 +469,8 @@ def display_selected_codes(key_suffix=""):
                         overwrite=False,
                         use_logical_type=True) #  use_logical_type=True is needed to handle datetime columns correctly
                     # - this isn't properly documented anywhere in snowflake docs
+                    # the cached definition listing on Browse Definitions is now out of date
+                    get_definitions_in_tables.clear()
                     st.success(f"""Definition saved to Snowflake:
                         {st.session_state.config['definition_library']['database']}.
                         {st.session_state.config['definition_library']['schema']}.ICB_DEFINITIONS""")
@@ -492,7 +503,8 @@ def display_selected_codes(key_suffix=""):
                             # st.session_state.selected_codes.remove(code)
                             if st.session_state.current_definition:
                                 st.session_state.current_definition.remove_code(code)
-                                print(f"Removed {code.code} from {vocabulary} leaving {st.session_state.current_definition.codes}")
+                                logger.debug("Removed %s from %s leaving %s", code.code, vocabulary,
+                                             st.session_state.current_definition.codes)
                             st.rerun()
 
                 st.markdown("---")
@@ -630,25 +642,28 @@ def process_definitions_for_upload(
     if not definition_files:
         return None, [], {}
 
-    all_rows = pd.DataFrame()
+    definition_frames = []
     definitions_to_remove = {}
     definitions_to_add = []
 
-    for def_file in definition_files:
-        file_path = os.path.join("data/definitions", def_file)
-        definition = Definition.from_json(file_path)
+    definitions = [Definition.from_json(os.path.join("data/definitions", def_file)) for def_file in definition_files]
 
-        query = f"""
-        SELECT DEFINITION_ID, DEFINITION_NAME, VERSION_DATETIME
-        FROM {config["definition_library"]["database"]}.
-        {config["definition_library"]["schema"]}.
-        AIC_DEFINITIONS
-        WHERE DEFINITION_ID = '{definition.definition_id}'
-        """
-        existing_definition = session.sql(query).to_pandas()
-
-        if not existing_definition.empty:
-            max_version_in_db = existing_definition["VERSION_DATETIME"].max()
+    # look up the latest uploaded version of every definition in one query, rather than a round-trip per file
+    query = f"""
+    SELECT DEFINITION_ID, MAX(VERSION_DATETIME) AS VERSION_DATETIME
+    FROM {config["definition_library"]["database"]}.
+    {config["definition_library"]["schema"]}.
+    AIC_DEFINITIONS
+    WHERE DEFINITION_ID IN ({", ".join("?" for _ in definitions)})
+    GROUP BY DEFINITION_ID
+    """
+    existing_versions = fetch_dataframe(query, params=[d.definition_id for d in definitions], session=session)
+    max_versions_in_db = dict(zip(existing_versions["DEFINITION_ID"], existing_versions["VERSION_DATETIME"],
+                                  strict=True))
+
+    for definition in definitions:
+        if definition.definition_id in max_versions_in_db:
+            max_version_in_db = max_versions_in_db[definition.definition_id]
             current_version = definition.version_datetime
 
             if current_version == max_version_in_db:
@@ -662,9 +677,12 @@ def process_definitions_for_upload(
 
         definition.uploaded_datetime = datetime.now()
 
-        all_rows = pd.concat([all_rows, definition.to_dataframe()])
+        definition_frames.append(definition.to_dataframe())
         definitions_to_add.append(definition.definition_name)
 
+    # concatenate once at the end, as concatenating inside the loop copies every earlier row on each iteration
+    all_rows = pd.concat(definition_frames) if definition_frames else pd.DataFrame()
+
     return all_rows, definitions_to_add, definitions_to_remove
 
 def update_aic_definitions_table(config: Optional[dict] = None, session: Optional[Session] = None):
@@ -685,14 +703,16 @@ def update_aic_definitions_table(config: Optional[dict] = None, session: Optiona
     # Get definition files
     definition_files = load_definitions_list_from_local_files()
 
-    # Process all definition files
-    all_rows = pd.DataFrame()
+    # Process all definition files, building one frame for a single write
+    definition_frames = []
 
     for def_file in definition_files:
         file_path = os.path.join("data/definitions", def_file)
         definition = Definition.from_json(file_path)
         definition.uploaded_datetime = datetime.now()
-        all_rows = pd.concat([all_rows, definition.to_dataframe()])
+        definition_frames.append(definition.to_dataframe())
+
+    all_rows = pd.concat(definition_frames) if definition_frames else pd.DataFrame()
 
     if not all_rows.empty:
         df = all_rows.copy()
@@ -703,6 +723,10 @@ def update_aic_definitions_table(config: Optional[dict] = None, session: Optiona
                 table_name="AIC_DEFINITIONS",
                 overwrite=True,
                 use_logical_type=True)
+        # overwrite=True recreates the table, so the cached table listing may predate it
+        get_table_names_in_schema.clear()
+        # the cached definition listing on Browse Definitions is now out of date
+        get_definitions_in_tables.clear()
         print(f"Uploaded AIC_DEFINITIONS table with {len(all_rows)} rows")
     else:
         print("No definitions found to load")
@@ -711,13 +735,16 @@ def update_aic_definitions_table(config: Optional[dict] = None, session: Optiona
 def create_conditions_feature_table(config: Optional[dict] = None, session: Optional[Session] = None):
     """
     Create DEV_CONDITIONS feature table from DEFINITIONSTORE and clinical data.
-    Filters to events from 2020 onwards for performance.
+    Filters to events from 2020 onwards for performance, and clusters on the definition name as downstream
+    reads are per-condition.
     """
     config = config or st.session_state.config
     session = session or st.session_state.session
 
     sql = f"""
-    CREATE OR REPLACE TABLE {config["feature_store"]["database"]}.{config["feature_store"]["schema"]}.DEV_CONDITIONS AS
+    CREATE OR REPLACE TABLE {config["feature_store"]["database"]}.{config["feature_store"]["schema"]}.DEV_CONDITIONS
+    CLUSTER BY (CONDITION_DEFINITION_NAME)
+    AS
     WITH
         definitionstore_filtered AS (
             SELECT DEFINITION_ID, DEFINITION_NAME, CODE, VOCABULARY, SOURCE_TABLE
@@ -796,5 +823,7 @@ def create_conditions_feature_table(config: Optional[dict] = None, session: Opti
     SELECT * FROM apc_procedure
     """
 
-    session.sql(sql).collect()
+    session.sql(sql).collect(statement_params=query_tag_params("conditions_feature"))
+    # the cached table listing may predate this table
+    get_table_names_in_schema.clear()
     print("Created DEV_CONDITIONS feature table")
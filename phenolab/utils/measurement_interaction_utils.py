@@ -1,3 +1,4 @@
+import logging
 import os
 from decimal import Decimal
 from typing import List, Optional
@@ -5,10 +6,18 @@ from typing import List, Optional
 import pandas as pd
 import streamlit as st
 from snowflake.snowpark import Session
-from utils.database_utils import get_measurement_unit_statistics
+from utils.database_utils import (
+    fetch_dataframe,
+    get_measurement_unit_statistics_for_definitions,
+    get_table_names_in_schema,
+    query_tag_params,
+    standard_query_cache,
+)
 from utils.definition_interaction_utils import load_definition
 from utils.measurement import MeasurementConfig, UnitMapping, load_measurement_config_from_json
 
+logger = logging.getLogger(__name__)
+
 
 def load_measurement_definitions_list() -> list[str]:
     """
@@ -33,7 +42,7 @@ def load_measurement_configs_list(config: Optional[dict] = None) -> List[str]:
     """
     measurement_config_list = []
     config = config or st.session_state.config
-    print(f"Loading shared measurement configs for ICB: {config['icb_name']}")
+    logger.debug("Loading shared measurement configs for ICB: %s", config["icb_name"])
     if os.path.exists("data/measurements"):
         measurement_config_list = [f for f in os.listdir("data/measurements")
                         if f.endswith(".json") and f.startswith("standard_")]
@@ -116,32 +125,36 @@ def update_all_measurement_configs():
         except Exception as e:
             st.warning(f"Could not load config {config_file}: {e}")
 
+    # unit statistics for every config's definition, aggregated in Snowflake in one query
+    all_unit_stats = get_measurement_unit_statistics_for_definitions(sorted(existing_configs))
+    unit_stats_by_definition = (dict(tuple(all_unit_stats.groupby("DEFINITION_NAME", sort=False)))
+                                if not all_unit_stats.empty else {})
+
     for def_name, config in existing_configs.items():
         # try:
-        unit_stats = get_measurement_unit_statistics(def_name)
+        unit_stats = unit_stats_by_definition.get(def_name)
 
         if unit_stats is None or unit_stats.empty:
             continue
 
         existing_source_units = {m.source_unit for m in config.unit_mappings}
-        config_changed = False
-
-        for idx, row in unit_stats.iterrows():
-            source_unit = row['UNIT']
-
-            if source_unit not in existing_source_units:
-                config.unit_mappings.append(UnitMapping(
-                    source_unit=source_unit,
-                    standard_unit="",
-                    source_unit_count=row['TOTAL_COUNT'],
-                    source_unit_lq=row['LOWER_QUARTILE'],
-                    source_unit_median=row['MEDIAN'],
-                    source_unit_uq=row['UPPER_QUARTILE']
-                ))
-                new_units_count += 1
-                config_changed = True
-
-        if config_changed:
+
+        # pick out units not yet in the config with one mask, then only build mappings for those
+        new_units = unit_stats[~unit_stats['UNIT'].isin(existing_source_units)]
+        for source_unit, count, lq, median, uq in zip(new_units['UNIT'], new_units['TOTAL_COUNT'],
+                                                      new_units['LOWER_QUARTILE'], new_units['MEDIAN'],
+                                                      new_units['UPPER_QUARTILE'], strict=True):
+            config.unit_mappings.append(UnitMapping(
+                source_unit=source_unit,
+                standard_unit="",
+                source_unit_count=count,
+                source_unit_lq=lq,
+                source_unit_median=median,
+                source_unit_uq=uq
+            ))
+        new_units_count += len(new_units)
+
+        if not new_units.empty:
             config.mark_modified()
             config.save_to_json(directory="data/measurements")
             updated_count += 1
@@ -173,6 +186,68 @@ def get_available_measurement_configs():
     return available_configs
 
 
+@standard_query_cache
+def get_measurement_config_names() -> pd.DataFrame:
+    """
+    Get the definition name and config ID of each measurement config loaded into the MEASUREMENT_CONFIGS table
+    """
+    query = f"""
+        SELECT DISTINCT
+            DEFINITION_NAME,
+            CONFIG_ID
+        FROM {st.session_state.config["measurement_configs"]["database"]}.
+        {st.session_state.config["measurement_configs"]["schema"]}.MEASUREMENT_CONFIGS
+        ORDER BY DEFINITION_NAME
+        """
+    return fetch_dataframe(query)
+
+
+@standard_query_cache
+def get_measurement_config_summary(config_id: str) -> pd.DataFrame:
+    """
+    Get the primary unit, value bounds and unit mappings (with their counts) of a loaded measurement config in a
+    single round-trip. The config-level columns are repeated on every mapping row; the LEFT JOINs keep one row when
+    there are no mappings.
+    """
+    query = f"""
+        SELECT
+            su.PRIMARY_UNIT,
+            vb.LOWER_LIMIT,
+            vb.UPPER_LIMIT,
+            um.SOURCE_UNIT,
+            um.STANDARD_UNIT,
+            um.SOURCE_UNIT_COUNT
+        FROM (
+            SELECT MAX(UNIT) AS PRIMARY_UNIT
+            FROM {st.session_state.config["measurement_configs"]["database"]}.
+            {st.session_state.config["measurement_configs"]["schema"]}.STANDARD_UNITS
+            WHERE CONFIG_ID = ?
+                AND PRIMARY_UNIT = TRUE
+        ) su
+        LEFT JOIN (
+            SELECT
+                LOWER_LIMIT,
+                UPPER_LIMIT
+            FROM {st.session_state.config["measurement_configs"]["database"]}.
+            {st.session_state.config["measurement_configs"]["schema"]}.VALUE_BOUNDS
+            WHERE CONFIG_ID = ?
+            LIMIT 1
+        ) vb ON TRUE
+        LEFT JOIN (
+            SELECT
+                COALESCE(SOURCE_UNIT, 'No Unit') AS SOURCE_UNIT,
+                STANDARD_UNIT,
+                SUM(SOURCE_UNIT_COUNT) AS SOURCE_UNIT_COUNT
+            FROM {st.session_state.config["measurement_configs"]["database"]}.
+            {st.session_state.config["measurement_configs"]["schema"]}.UNIT_MAPPINGS
+            WHERE CONFIG_ID = ?
+            GROUP BY 1, 2
+        ) um ON TRUE
+        ORDER BY um.SOURCE_UNIT
+        """
+    return fetch_dataframe(query, params=[config_id, config_id, config_id])
+
+
 @st.cache_data(ttl=600, show_spinner="Loading measurement values...")
 def get_measurement_values(definition_name, limit = 100000):
     """
@@ -187,12 +262,12 @@ def get_measurement_values(definition_name, limit = 100000):
         {st.session_state.config["definition_library"]["schema"]}.DEFINITIONSTORE def
         ON obs.OBSERVATION_CONCEPT_CODE = def.CODE
         AND obs.OBSERVATION_CONCEPT_VOCABULARY = def.VOCABULARY
-    WHERE def.DEFINITION_NAME = '{definition_name}'
+    WHERE def.DEFINITION_NAME = ?
         AND RESULT_VALUE IS NOT NULL
         AND TRY_CAST(RESULT_VALUE AS FLOAT) IS NOT NULL
-    LIMIT {limit}
+    LIMIT ?
     """
-    df = st.session_state.session.sql(query).to_pandas()
+    df = fetch_dataframe(query, params=[definition_name, limit])
     df.columns = df.columns.str.lower()
     return df
 
@@ -223,16 +298,18 @@ def apply_conversions(df, config):
         if conv.convert_to_unit == config.primary_standard_unit:
             conversion_dict[conv.convert_from_unit] = conv
 
-    for idx, row in df_converted.iterrows():
-        unit_to_convert = row['mapped_unit'] if pd.notna(row['mapped_unit']) else row['unit']
-
-        if unit_to_convert in conversion_dict:
-            conv = conversion_dict[unit_to_convert]
-            original_value = row['value']
-            converted_value = (original_value + conv.pre_offset) * conv.multiply_by + conv.post_offset
-            df_converted.at[idx, 'converted_value'] = converted_value
-        elif unit_to_convert == config.primary_standard_unit:
-            df_converted.at[idx, 'converted_value'] = row['value']
+    # look up each row's conversion by unit as whole columns, rather than row by row; rows in the primary unit
+    # or without a conversion keep their value
+    unit_to_convert = df_converted['mapped_unit'].fillna(df_converted['unit'])
+    has_conversion = unit_to_convert.isin(list(conversion_dict))
+    if has_conversion.any():
+        units = unit_to_convert[has_conversion]
+        pre_offset = units.map({unit: conv.pre_offset for unit, conv in conversion_dict.items()})
+        multiply_by = units.map({unit: conv.multiply_by for unit, conv in conversion_dict.items()})
+        post_offset = units.map({unit: conv.post_offset for unit, conv in conversion_dict.items()})
+        df_converted.loc[has_conversion, 'converted_value'] = (
+            (df_converted.loc[has_conversion, 'value'] + pre_offset) * multiply_by + post_offset
+        )
 
     return df_converted
 
@@ -619,8 +696,15 @@ def create_measurement_configs_tables(config: Optional[dict] = None, session: Op
             LOWER_LIMIT FLOAT,
             UPPER_LIMIT FLOAT
     )"""]
-    for query in queries:
-        session.sql(query).collect()
+    # submit as one Snowflake Scripting block to avoid a round-trip per table
+    session.sql(f"""
+    EXECUTE IMMEDIATE $$
+    BEGIN
+        {";".join(queries)};
+    END;
+    $$""").collect(statement_params=query_tag_params("measurement_configs"))
+    # the cached table listing may predate these tables
+    get_table_names_in_schema.clear()
     print("Measurement config tables created (replaced existing)")
 
 def load_measurement_configs_into_tables(config: Optional[dict] = None, session: Optional[Session] = None):
@@ -710,6 +794,9 @@ def load_measurement_configs_into_tables(config: Optional[dict] = None, session:
             table_name="VALUE_BOUNDS",
             use_logical_type=True)
 
+    # cached reads of the config tables are now out of date
+    get_measurement_config_names.clear()
+    get_measurement_config_summary.clear()
     print(f"Loaded {total_configs} measurement configs into Snowflake tables")
     return total_configs
 
@@ -788,13 +875,16 @@ def count_sigfig(number: float,
 def create_measurements_feature_table(config: Optional[dict] = None, session: Optional[Session] = None):
     """
     Create DEV_MEASUREMENTS feature table from DEFINITIONSTORE, measurement configs, and clinical data.
-    Filters to events from 2020 onwards for performance.
+    Filters to events from 2020 onwards for performance, and clusters on the definition name as downstream
+    reads are per-measurement.
     """
     config = config or st.session_state.config
     session = session or st.session_state.session
 
     sql = f"""
-    CREATE OR REPLACE TABLE {config["feature_store"]["database"]}.{config["feature_store"]["schema"]}.DEV_MEASUREMENTS AS
+    CREATE OR REPLACE TABLE {config["feature_store"]["database"]}.{config["feature_store"]["schema"]}.DEV_MEASUREMENTS
+    CLUSTER BY (MEASUREMENT_DEFINITION_NAME)
+    AS
     WITH
         definitionstore_filtered AS (
             SELECT ds.DEFINITION_ID, ds.DEFINITION_NAME, ds.CODE, ds.VOCABULARY, ds.SOURCE_TABLE
@@ -915,6 +1005,8 @@ def create_measurements_feature_table(config: Optional[dict] = None, session: Op
     FROM with_bounds_checks
     """
 
-    session.sql(sql).collect()
+    session.sql(sql).collect(statement_params=query_tag_params("measurements_feature"))
+    # the cached table listing may predate this table
+    get_table_names_in_schema.clear()
     print("Created DEV_MEASUREMENTS feature table")
 
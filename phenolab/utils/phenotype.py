@@ -24,6 +24,10 @@ This contains classes for:
 -- Phenotype = (A AND B) OR C
 """
 
+# DSL tokens, compiled once rather than on every validation
+_LABEL_RE = re.compile(r"\b[A-Z]\b")
+_OPERATOR_RE = re.compile(r"\b(AND|OR|NOT)\b")
+
 
 class ConditionType(str, Enum):
     """
@@ -300,7 +304,7 @@ class Phenotype:
 
         # 1. Labels in DSL must equal labels of condition blocks
         valid_labels = set(self.condition_blocks.keys())
-        used_labels = set(re.findall(r"\b[A-Z]\b", self.expression))
+        used_labels = set(_LABEL_RE.findall(self.expression))
 
         invalid_labels = used_labels - valid_labels
         if invalid_labels:
@@ -311,7 +315,7 @@ class Phenotype:
             return False, f"Unused condition blocks: {', '.join(unused_labels)}"
 
         # 2. Check for valid operators (AND, OR, NOT)
-        operators = re.findall(r"\b(AND|OR|NOT)\b", self.expression)
+        operators = _OPERATOR_RE.findall(self.expression)
         for op in operators:
             if op not in [o.value for o in LogicalOperator]:
                 return False, f"Invalid operator in expression: {op}"
@@ -344,11 +348,12 @@ class Phenotype:
         if not self.expression:
             return ""
 
-        expanded = self.expression
-        for label, block in self.condition_blocks.items():
-            expanded = re.sub(r"\b" + label + r"\b", f"[{block.to_dsl_description()}]", expanded)
+        # labels are single capital letters, so swap them all in one pass of the compiled label pattern
+        def _describe(match: re.Match) -> str:
+            block = self.condition_blocks.get(match.group(0))
+            return f"[{block.to_dsl_description()}]" if block else match.group(0)
 
-        return expanded
+        return _LABEL_RE.sub(_describe, self.expression)
 
     def to_dict(self) -> dict:
         """